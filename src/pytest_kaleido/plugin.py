@@ -14,12 +14,19 @@ Key features:
 """
 
 import logging
-from typing import List, Optional
+import re
+import sys
+from operator import attrgetter
+from typing import Iterable, List, Optional
 
 import pytest
 
 log = logging.getLogger(__name__)
 
+# Precompiled patterns splitting on unescaped separators, and the matching escape sequences
+_ESCAPED_SPLIT = {',': re.compile(r'(?<!\\),'), ':': re.compile(r'(?<!\\):')}
+_UNESC = {',': '\\,', ':': '\\:'}
+
 
 def pytest_addoption(parser):
     """
@@ -55,24 +62,14 @@ def _split_escaped(s, sep):
     Split a string by sep, but allow escaping sep with backslash only if it precedes sep.
     Only split on unescaped sep. Remove escape backslashes from result.
     """
-    log.debug("==> _split_escaped s=%s, sep=%s", s, sep)
-    parts = []
-    buf = ''
-    i = 0
-    while i < len(s):
-        if s[i] == '\\' and i + 1 < len(s) and s[i + 1] == sep:
-            buf += sep
-            i += 2
-        elif s[i] == sep:
-            parts.append(buf)
-            buf = ''
-            i += 1
-        else:
-            buf += s[i]
-            i += 1
-    parts.append(buf)
-    log.debug("<== _split_escaped ret=%s", parts)
-    return parts
+    if '\\' not in s:
+        return s.split(sep)
+    pattern = _ESCAPED_SPLIT.get(sep)
+    if pattern is None:  # other separators are compiled once, on first use
+        pattern = _ESCAPED_SPLIT[sep] = re.compile(r'(?<!\\)' + re.escape(sep))
+        _UNESC[sep] = '\\' + sep
+    escaped = _UNESC[sep]
+    return [p.replace(escaped, sep) for p in pattern.split(s)]
 
 
 def _parse_variant_args_to_lists(variant_args: Optional[List[str]]) -> List[List[str]]:
@@ -110,23 +107,33 @@ def _parse_variant_args_to_lists(variant_args: Optional[List[str]]) -> List[List
         >>> _parse_variant_args_to_lists(["prod:v1", "test:v2"])  # inheritance resets
         [['prod', 'v1'], ['test', 'v2']]
     """
-    log.debug("==> _parse_variant_args_to_lists variant_args=%s", variant_args)
+    debug = log.isEnabledFor(logging.DEBUG)
+    if debug:
+        log.debug("==> _parse_variant_args_to_lists variant_args=%s", variant_args)
     ret = []
     if not variant_args:
-        log.debug("<== _parse_variant_args_to_lists ret=%s", ret)
+        if debug:
+            log.debug("<== _parse_variant_args_to_lists ret=%s", ret)
         return ret
     for arg in variant_args:
+        # without escapes, split with str.split directly
+        escaped = '\\' in arg
+        if not escaped and ':' not in arg:
+            # only variant names, no attributes to split or inherit
+            ret.extend([sys.intern(v)] for v in arg.split(',') if v)
+            continue
         prev_attrs = []
-        for vstr in _split_escaped(arg, ','):
-            attrs = _split_escaped(vstr, ':')
-            attrs = [a for a in attrs if a]
+        for vstr in (_split_escaped(arg, ',') if escaped else arg.split(',')):
+            attrs = _split_escaped(vstr, ':') if escaped else vstr.split(':')
+            attrs = [sys.intern(a) for a in attrs if a]
             if len(attrs) == 1 and prev_attrs:
-                attrs = prev_attrs + [attrs[0]]
+                attrs = [*prev_attrs, attrs[0]]
             if len(attrs) > 1:
                 prev_attrs = attrs[:-1]
             if attrs:
                 ret.append(attrs)
-    log.debug("<== _parse_variant_args_to_lists ret=%s", ret)
+    if debug:
+        log.debug("<== _parse_variant_args_to_lists ret=%s", ret)
     return ret
 
 
@@ -137,18 +144,23 @@ class VariantPluginBase:
     Provides helpers for parsing, deduplication, and variant/attribute access.
     """
 
-    def __init__(self, variant: str, attributes: List[str] = None):
+    __slots__ = ('attributes', 'variant')
+
+    def __init__(self, variant: str, attributes: Iterable[str] = None):
         """
         Initialize a VariantPluginBase object.
         :param variant: The variant name (string).
-        :param attributes: List of attribute strings (excluding the variant name). Defaults to empty list if None.
+        :param attributes: Iterable of attribute strings (excluding the variant name).
+                           Defaults to empty list if None. Stored as a sorted list.
         """
-        log.debug("==> VariantPluginBase.__init__ variant=%s, attributes=%s",
-                  variant, attributes)
-        # Store attributes as a sorted set (unique, order not preserved)
-        self.attributes = sorted(set(attributes or []))
+        attributes = list(attributes or ())
+        if len(attributes) < 2:
+            # nothing to deduplicate or sort
+            self.attributes = attributes
+        else:
+            # Store attributes as a sorted set (unique, order not preserved)
+            self.attributes = sorted(set(attributes))
         self.variant = variant  # variant name (string)
-        log.debug("<== VariantPluginBase.__init__ ret=None")
 
     @property
     def attrs(self):
@@ -252,10 +264,7 @@ class VariantPluginBase:
             if not attrs:
                 continue
             *attributes, variant = attrs
-            if variant in variant_map:
-                variant_map[variant].update(attributes)
-            else:
-                variant_map[variant] = set(attributes)
+            variant_map.setdefault(variant, set()).update(attributes)
         ret = [cls(variant=variant, attributes=sorted(attributes)) for
                variant, attributes in variant_map.items()]
         log.debug("<== VariantPluginBase.parse_variants_from_list ret=%s", ret)
@@ -268,6 +277,9 @@ class VariantPluginBase:
         """
         log.debug("==> VariantPluginBase.get_attributes variant_objs=%s",
                   variant_objs)
+        if not variant_objs:
+            log.debug("<== VariantPluginBase.get_attributes ret=[] (no variants)")
+            return []
         attributes = set()
         for obj in variant_objs:
             attributes.update(obj.attributes)
@@ -282,44 +294,78 @@ class VariantPluginBase:
 
         :param variant_objs: List of VariantPluginBase objects.
         :param attributes: Single attribute (string), list of attributes, or None for variants with no attributes.
-        :return: List of VariantPluginBase objects.
+        :return: List of VariantPluginBase objects, sorted by variant name.
+                 Sorting is linear if variant_objs is already sorted by variant name.
         """
         log.debug(
             "==> VariantPluginBase.get_variants variant_objs=%s, attributes=%s",
             variant_objs, attributes)
-
-        # Normalize attributes to a list for consistent processing
-        if attributes is None:
-            attr_list = None
-        elif isinstance(attributes, str):
-            attr_list = [attributes]
+        if not variant_objs:
+            log.debug("<== VariantPluginBase.get_variants ret=[] (no variants)")
+            return []
+
+        # Filter variant objects, None or empty selects variants with no attributes
+        if isinstance(attributes, str):
+            filtered_variants = (obj for obj in variant_objs if attributes in obj.attributes)
+        elif not attributes:
+            filtered_variants = (obj for obj in variant_objs if not obj.attributes)
         else:
-            attr_list = attributes
+            query = frozenset(attributes)
+            filtered_variants = (obj for obj in variant_objs if not query.isdisjoint(obj.attributes))
 
-        # Filter variant objects
-        if attr_list is None or not attr_list:
-            filtered_variants = [obj for obj in variant_objs if not obj.attributes]
-        else:
-            filtered_variants = [obj for obj in variant_objs
-                                 if any(attr in obj.attributes for attr in attr_list)]
-
-        ret = sorted(filtered_variants, key=lambda x: x.variant)
-        log.debug("<== VariantPluginBase.get_variants ret=%s",
-                  [(obj.attributes, obj.variant) for obj in ret])
+        ret = sorted(filtered_variants, key=attrgetter('variant'))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("<== VariantPluginBase.get_variants ret=%s",
+                      [(obj.attributes, obj.variant) for obj in ret])
         return ret
 
 
+class VariantFilter:
+    """
+    Filtering helpers over a list of VariantPluginBase objects, returned by the variant_filter fixture.
+    """
+
+    __slots__ = ('_variant_objs', '_sorted_objs')
+
+    def __init__(self, variant_objs: List[VariantPluginBase]):
+        self._variant_objs = variant_objs
+        # sorted once, so that get_variants sorts already ordered results
+        self._sorted_objs = sorted(variant_objs, key=attrgetter('variant'))
+
+    def by_attribute(self, attribute=None):
+        """Get variant objects for single attribute - returns full objects instead of just names"""
+        return VariantPluginBase.get_variants(self._sorted_objs, attribute)
+
+    def by_attributes(self, attributes=None):
+        """Get variant objects with any of the attributes (replaces variants_with_attributes)"""
+        return VariantPluginBase.get_variants(self._sorted_objs, attributes)
+
+    def all_variants(self):
+        """Get all variant objects"""
+        return list(self._variant_objs)
+
+    def all_variant_attributes(self):
+        """Get all unique attributes from all variants"""
+        return VariantPluginBase.get_attributes(self._variant_objs)
+
+
 def get_all_variant_objs(config):
     """
     Read config and parse all variant objects for the current session.
     Returns a list of VariantPluginBase objects.
+    The parsed attribute lists are cached on config, as the options cannot change during the session.
+    Each call builds new objects, so callers do not share mutable variants.
     """
     log.debug("==> get_all_variant_objs config=%s", config)
-    variant_args = config.getoption('variant')
-    if not variant_args:
-        ini_variants = config.getini('KALEIDO_VARIANTS')
-        variant_args = [ini_variants] if ini_variants else []
-    ret = VariantPluginBase.parse_variants(variant_args)
+    attr_lists = getattr(config, '_kaleido_variant_lists', None)
+    if attr_lists is None:
+        variant_args = config.getoption('variant')
+        if not variant_args:
+            ini_variants = config.getini('KALEIDO_VARIANTS')
+            variant_args = [ini_variants] if ini_variants else []
+        attr_lists = _parse_variant_args_to_lists(variant_args)
+        config._kaleido_variant_lists = attr_lists
+    ret = VariantPluginBase.parse_variants_from_list(attr_lists)
     log.debug("<== get_all_variant_objs ret=%s", ret)
     return ret
 
@@ -329,13 +375,16 @@ def pytest_generate_tests(metafunc):
     Parametrize tests with all variants if the 'variant' fixture is used.
     """
     log.debug("==> pytest_generate_tests metafunc=%s", metafunc)
-    variant_objs = get_all_variant_objs(metafunc.config)
-    if 'variant' in metafunc.fixturenames:
-        ids = [":".join(obj.attributes + [obj.variant]) for obj in variant_objs]
-        metafunc.parametrize('variant', variant_objs, ids=ids)
-        log.debug("<== pytest_generate_tests ret=None (parametrized)")
-    else:
+    if 'variant' not in metafunc.fixturenames:
         log.debug("<== pytest_generate_tests ret=None (not parametrized)")
+        return
+    variant_objs = get_all_variant_objs(metafunc.config)
+    ids = getattr(metafunc.config, '_kaleido_variant_ids', None)
+    if ids is None:
+        ids = [":".join((*obj.attributes, obj.variant)) for obj in variant_objs]
+        metafunc.config._kaleido_variant_ids = ids
+    metafunc.parametrize('variant', variant_objs, ids=ids)
+    log.debug("<== pytest_generate_tests ret=None (parametrized)")
 
 
 @pytest.fixture
@@ -349,24 +398,36 @@ def variant(request):
     return ret
 
 
-@pytest.fixture
-def variant_setup(request):
+@pytest.fixture(scope='session')
+def _variant_setup_objs(request):
     """
-    Fixture providing the variant-setup as a list of VariantPluginBase objects (for setup/discovery).
+    Session scoped helper for variant_setup, the setup string is parsed only once.
     """
-    log.debug("==> variant_setup request=%s", request)
+    log.debug("==> _variant_setup_objs request=%s", request)
     config = request.config
     setup_str = config.getoption('variant_setup') or config.getini(
         'KALEIDO_VARIANT_SETUP')
     if not setup_str:
-        log.debug("<== variant_setup ret=[] (no setup_str)")
+        log.debug("<== _variant_setup_objs ret=[] (no setup_str)")
         return []
     ret = VariantPluginBase.parse_variants([setup_str])
-    log.debug("<== variant_setup ret=%s", ret)
+    log.debug("<== _variant_setup_objs ret=%s", ret)
     return ret
 
 
 @pytest.fixture
+def variant_setup(_variant_setup_objs):
+    """
+    Fixture providing the variant-setup as a list of VariantPluginBase objects (for setup/discovery).
+    Each test gets its own list, the variant objects in it are shared.
+    """
+    log.debug("==> variant_setup _variant_setup_objs=%s", _variant_setup_objs)
+    ret = list(_variant_setup_objs)
+    log.debug("<== variant_setup ret=%s", ret)
+    return ret
+
+
+@pytest.fixture(scope='session')
 def variant_filter(request):
     """
     Returns a function with methods for different filtering needs for variants:
@@ -374,30 +435,12 @@ def variant_filter(request):
     - variant_filter.by_attributes(attrs) -> variant objects with any of the attributes
     - variant_filter.all_variants() -> all variant objects
     - variant_filter.all_variant_attributes() -> all unique attributes from all variants
+    Session scoped, the variants do not change during the session.
     """
     log.debug("==> variant_filter request=%s", request)
-    variant_objs = get_all_variant_objs(request.config)
-
-    class VariantFilter:
-
-        def by_attribute(self, attribute=None):
-            """Get variant objects for single attribute - returns full objects instead of just names"""
-            return VariantPluginBase.get_variants(variant_objs, attribute)
-
-        def by_attributes(self, attributes=None):
-            """Get variant objects with any of the attributes (replaces variants_with_attributes)"""
-            return VariantPluginBase.get_variants(variant_objs, attributes)
-
-        def all_variants(self):
-            """Get all variant objects"""
-            return variant_objs
-
-        def all_variant_attributes(self):
-            """Get all unique attributes from all variants"""
-            return VariantPluginBase.get_attributes(variant_objs)
-
-    log.debug("<== variant_filter ret=VariantFilter")
-    return VariantFilter()
+    ret = VariantFilter(get_all_variant_objs(request.config))
+    log.debug("<== variant_filter ret=%s", ret)
+    return ret
 
 
 def pytest_report_header(config):
@@ -407,10 +450,21 @@ def pytest_report_header(config):
     log.debug("==> pytest_report_header config=%s", config)
     variant_args = config.getoption('variant')
     if not variant_args:
-        variant_args = [config.getini('KALEIDO_VARIANTS')] if config.getini(
-            'KALEIDO_VARIANTS') else []
+        ini_variants = config.getini('KALEIDO_VARIANTS')
+        variant_args = [ini_variants] if ini_variants else []
     variant_setup = config.getoption('variant_setup') or config.getini(
         'KALEIDO_VARIANT_SETUP')
     ret = f"Variants: {variant_args} | Variant-setup: {variant_setup}"
     log.debug("<== pytest_report_header ret=%s", ret)
     return ret
+
+
+def pytest_unconfigure(config):
+    """
+    Drop the parsed variants and ids cached on config for the session.
+    """
+    log.debug("==> pytest_unconfigure config=%s", config)
+    for name in ('_kaleido_variant_lists', '_kaleido_variant_ids'):
+        if hasattr(config, name):
+            delattr(config, name)
+    log.debug("<== pytest_unconfigure ret=None")
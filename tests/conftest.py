@@ -1 +1,8 @@
+import importlib.util
+import os
+import sys
+
 pytest_plugins = 'pytester'
+
+if importlib.util.find_spec('pytest_kaleido') is None:  # allow running tests without installing the package
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
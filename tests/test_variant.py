@@ -1,20 +1,33 @@
 import logging
 
+import pytest
+
 log = logging.getLogger(__name__)
 
 
+@pytest.fixture(autouse=True)
+def _explicit_plugin(monkeypatch):
+    """Load only this plugin in pytester runs, skip scanning installed distributions for entry points."""
+    monkeypatch.setenv('PYTEST_DISABLE_PLUGIN_AUTOLOAD', '1')
+    monkeypatch.setenv('PYTEST_PLUGINS', 'pytest_kaleido.plugin')
+
+
 def test_variant_parametrize_basic(pytester):
+    # also covers variant_filter.by_attribute(None) with the same options, in one pytest run
     pytester.makepyfile(
         """
         def test_variant(variant):
-            assert hasattr(variant, 'variant')
             assert variant.variant in ('foo', 'bar')
+
+        def test_variants_none(variant_filter):
+            assert {obj.variant for obj in variant_filter.by_attribute(None)} == {'foo', 'bar'}
         """
     )
     result = pytester.runpytest('--kaleido-variant=foo,bar', '-v')
     result.stdout.fnmatch_lines([
         "*::test_variant[foo* PASSED*",
         '*::test_variant[bar* PASSED*',
+        '*::test_variants_none PASSED*',
     ])
     assert result.ret == 0
 
@@ -23,7 +36,6 @@ def test_variant_parametrize_with_attributes(pytester):
     pytester.makepyfile(
         """
         def test_variant(variant):
-            assert hasattr(variant, 'variant')
             assert isinstance(variant.attributes, list)
             # router:1.0,router:1.1,switch:2.0
             if 'router' in variant.attributes:
@@ -42,37 +54,54 @@ def test_variant_parametrize_with_attributes(pytester):
     assert result.ret == 0
 
 
-def test_variant_attributes_and_variants_fixtures(pytester):
+def test_variant_objects_per_test_function(pytester):
     pytester.makepyfile(
         """
-        def test_attributes_and_variants(variant_filter):
-            # Should collect all unique attributes (not just first)
-            assert set(variant_filter.all_variant_attributes()) == {'router', 'switch', 'special'}
-            assert set(obj.variant for obj in variant_filter.by_attribute('router')) == {'1.0', '1.1'}
-            assert set(obj.variant for obj in variant_filter.by_attribute('switch')) == {'2.0'}
-            assert set(obj.variant for obj in variant_filter.by_attribute('special')) == {'1.0', '1.1', '1,2', '1:0'}
+        def test_a(variant):
+            variant.attributes.append('zzz')
+
+        def test_b(variant):
+            assert variant.attributes == ['a']
         """
     )
-    result = pytester.runpytest(
-        r'--kaleido-variant=router:1.0,router:1.1,switch:2.0,router:special:1.0,' +
-        r'router:special:1.1,special:1\,2,special:1\:0',
-        '-o', 'log_cli_level=DEBUG', '-vv')
+    result = pytester.runpytest('--kaleido-variant=a:v1', '-v')
     result.stdout.fnmatch_lines([
-        '*::test_attributes_and_variants PASSED*',
+        '*::test_a[a:v1* PASSED*',
+        '*::test_b[a:v1* PASSED*',
     ])
     assert result.ret == 0
 
 
-def test_variant_variants_none_attributes(pytester):
+def test_variant_attributes_and_variants_fixtures(pytester):
     pytester.makepyfile(
         """
-        def test_variants_none(variant_filter):
-            assert set(obj.variant for obj in variant_filter.by_attribute(None)) == {'foo', 'bar'}
+        def test_attributes_and_variants(variant_filter):
+            # Should collect all unique attributes (not just first)
+            assert set(variant_filter.all_variant_attributes()) == {'router', 'switch', 'special'}
+            assert {obj.variant for obj in variant_filter.by_attribute('router')} == {'1.0', '1.1'}
+            assert {obj.variant for obj in variant_filter.by_attribute('switch')} == {'2.0'}
+            assert {obj.variant for obj in variant_filter.by_attribute('special')} == {'1.0', '1.1', '1,2', '1:0'}
+
+        def test_variants_with_attributes(variant_filter):
+            # Should return all variants with 'router' or 'special' attributes
+            objs = variant_filter.by_attributes(['router', 'special'])
+            for obj in objs:
+                assert not {'router', 'special'}.isdisjoint(obj.attributes)
+            assert {obj.variant for obj in objs} == {'1.0', '1.1', '1,2', '1:0'}
+            # Should return all variants with 'switch' attribute
+            objs2 = variant_filter.by_attributes(['switch'])
+            for obj in objs2:
+                assert 'switch' in obj.attributes
+            assert {obj.variant for obj in objs2} == {'2.0'}
         """
     )
-    result = pytester.runpytest('--kaleido-variant=foo,bar', '-v')
+    result = pytester.runpytest(
+        r'--kaleido-variant=router:1.0,router:1.1,switch:2.0,router:special:1.0,' +
+        r'router:special:1.1,special:1\,2,special:1\:0',
+        '-o', 'log_cli_level=DEBUG', '-vv')
     result.stdout.fnmatch_lines([
-        '*::test_variants_none PASSED*',
+        '*::test_attributes_and_variants PASSED*',
+        '*::test_variants_with_attributes PASSED*',
     ])
     assert result.ret == 0
 
@@ -101,7 +130,7 @@ def test_variant_escape_characters(pytester):
         """
         def test_variant(variant):
             # router:special:1.0, router:special:1.1, router:special:1,2
-            if 'router' in variant.attributes and 'special' in variant.attributes:
+            if {'router', 'special'} <= set(variant.attributes):
                 assert variant.variant in ('1.0', '1.1', '1,2', '1:0')
             # '1:0' resets attributes, so should be ['1'] and variant '0'
             if variant.attributes == ['1'] and variant.variant == '0':
@@ -167,39 +196,12 @@ def test_variant_setup_escape_characters(pytester):
     assert result.ret == 0
 
 
-def test_variants_with_attributes_fixture(pytester):
-    pytester.makepyfile(
-        """
-        def test_variants_with_attributes(variant_filter):
-            # Should return all variants with 'router' or 'special' attributes
-            objs = variant_filter.by_attributes(['router', 'special'])
-            for obj in objs:
-                assert 'router' in obj.attributes or 'special' in obj.attributes
-            assert set(obj.variant for obj in objs) == {'1.0', '1.1', '1,2', '1:0'}
-            # Should return all variants with 'switch' attribute
-            objs2 = variant_filter.by_attributes(['switch'])
-            for obj in objs2:
-                assert 'switch' in obj.attributes
-            assert set(obj.variant for obj in objs2) == {'2.0'}
-        """
-    )
-    result = pytester.runpytest(
-        r'--kaleido-variant=router:1.0,router:1.1,switch:2.0,router:special:1.0,' +
-        r'router:special:1.1,special:1\,2,special:1\:0',
-        '-vv')
-    result.stdout.fnmatch_lines([
-        '*::test_variants_with_attributes PASSED*',
-    ])
-    assert result.ret == 0
-
-
 def test_variant_setup_fixture(pytester):
     pytester.makepyfile(
         """
         def test_setup(variant_setup):
             # variant_setup fixture should return a list of VariantPluginBase objects
             assert isinstance(variant_setup, list)
-            assert all(hasattr(obj, 'variant') and hasattr(obj, 'attributes') for obj in variant_setup)
             found = {(tuple(obj.attributes), obj.variant) for obj in variant_setup}
             expected = {
                 (('router',), 'setupA'),
@@ -213,3 +215,21 @@ def test_variant_setup_fixture(pytester):
         '*::test_setup PASSED*',
     ])
     assert result.ret == 0
+
+
+def test_variant_setup_fixture_list_per_test(pytester):
+    pytester.makepyfile(
+        """
+        def test_a(variant_setup):
+            variant_setup.clear()
+
+        def test_b(variant_setup):
+            assert [obj.variant for obj in variant_setup] == ['setupA', 'setupB']
+        """
+    )
+    result = pytester.runpytest('--kaleido-variant-setup=router:setupA,switch:setupB', '-v')
+    result.stdout.fnmatch_lines([
+        '*::test_a PASSED*',
+        '*::test_b PASSED*',
+    ])
+    assert result.ret == 0
@@ -1,14 +1,51 @@
 import logging
-import os
-import sys
-try:
-    from pytest_kaleido.plugin import _parse_variant_args_to_lists, VariantPluginBase
-except ModuleNotFoundError:  # allow running tests without installing the package
-    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
-    from pytest_kaleido.plugin import _parse_variant_args_to_lists, VariantPluginBase
+
+import pytest
+
+from pytest_kaleido.plugin import (_split_escaped, _parse_variant_args_to_lists, VariantPluginBase, VariantFilter,
+                                   get_all_variant_objs, pytest_unconfigure)
 
 log = logging.getLogger(__name__)
 
+# Expected (attributes, variant) results, built once at import
+_EXPECTED_VARIANT_SETUP = frozenset({
+    (('win',), 'C:App'),
+    (('linux',), '/opt/app'),
+    (('special',), 'setup1'),
+})
+_EXPECTED_MERGE_ATTRIBUTES = {
+    '1.0': frozenset({'router', 'special'}),
+    '1.1': frozenset({'router', 'special'}),
+    '2.0': frozenset({'switch'}),
+}
+_EXPECTED_ESCAPE_INHERITANCE = frozenset({
+    (('router', 'special'), '1.0'),
+    (('router', 'special'), '1.1'),
+    (('router', 'special'), '1,2'),
+    (('router', 'special'), '1:0'),
+    (('1',), '0'),
+})
+
+
+@pytest.fixture(scope='module')
+def sample_objs():
+    """Variant objects shared by the filtering tests, tests must not modify them."""
+    return [
+        VariantPluginBase('1.0', ('router', 'special')),
+        VariantPluginBase('1.1', ('router', 'special')),
+        VariantPluginBase('2.0', ('router', 'switch')),
+        VariantPluginBase('foo', ('router',)),
+        VariantPluginBase('bare', ()),
+    ]
+
+
+def test_split_escaped():
+    assert _split_escaped('a,b,,c', ',') == ['a', 'b', '', 'c']
+    assert _split_escaped(r'a\,b,c\:d', ',') == ['a,b', r'c\:d']
+    assert _split_escaped(r'C\:\App:x', ':') == [r'C:\App', 'x']
+    assert _split_escaped(r'a\;b;c', ';') == ['a;b', 'c']
+    assert _split_escaped(r'a\.b.c', '.') == ['a.b', 'c']
+
 
 def test_parse_variant_args_to_lists_no_attributes():
     variants = _parse_variant_args_to_lists(['foo,bar'])
@@ -90,30 +127,29 @@ def test_variantpluginbase_get_variants():
     switch_variants = VariantPluginBase.get_variants(objs, 'switch')
     none_variants = VariantPluginBase.get_variants(objs, None)
     # get_variants now returns objects, so extract variant names for comparison
-    assert set(obj.variant for obj in router_variants) == {'1.0', '1.1', '2.0'}
-    assert set(obj.variant for obj in switch_variants) == {'2.0'}
-    assert set(obj.variant for obj in none_variants) == {'foo'}
+    assert {obj.variant for obj in router_variants} == {'1.0', '1.1', '2.0'}
+    assert {obj.variant for obj in switch_variants} == {'2.0'}
+    assert {obj.variant for obj in none_variants} == {'foo'}
 
 
 def test_variants_with_attributes_logic():
     # Simulate variant objects
     objs = [
-        VariantPluginBase('1.0', ['router', 'special']),
-        VariantPluginBase('1.1', ['router', 'special']),
-        VariantPluginBase('2.0', ['router']),
-        VariantPluginBase('1,2', ['router', 'special']),
-        VariantPluginBase('1:0', ['router', 'special']),
-        VariantPluginBase('2.0', ['switch']),
-        VariantPluginBase('3.0', ['special']),
+        VariantPluginBase('1.0', ('router', 'special')),
+        VariantPluginBase('1.1', ('router', 'special')),
+        VariantPluginBase('2.0', ('router',)),
+        VariantPluginBase('1,2', ('router', 'special')),
+        VariantPluginBase('1:0', ('router', 'special')),
+        VariantPluginBase('2.0', ('switch',)),
+        VariantPluginBase('3.0', ('special',)),
     ]
-    # Filter for both 'router' and 'special'
-    filtered = [obj for obj in objs if
-                all(attr in obj.attributes for attr in ['router', 'special'])]
-    assert set(obj.variant for obj in filtered) == {'1.0', '1.1', '1,2', '1:0'}
+    variant_filter = VariantFilter(objs)
+    # Variants with both 'router' and 'special'
+    filtered = set(variant_filter.by_attribute('router')).intersection(variant_filter.by_attribute('special'))
+    assert {obj.variant for obj in filtered} == {'1.0', '1.1', '1,2', '1:0'}
     # Filter for 'switch'
-    filtered2 = [obj for obj in objs if
-                 all(attr in obj.attributes for attr in ['switch'])]
-    assert set(obj.variant for obj in filtered2) == {'2.0'}
+    filtered2 = variant_filter.by_attribute('switch')
+    assert [obj.variant for obj in filtered2] == ['2.0']
 
 
 def test_variantpluginbase_from_lists_merges_attributes():
@@ -129,40 +165,28 @@ def test_variantpluginbase_from_lists_merges_attributes():
         ['router', 'foo'],
     ]
     objs = VariantPluginBase.parse_variants_from_list(lists)
+    by_variant = {obj.variant: obj for obj in objs}
+    assert len(by_variant) == len(objs)
     # Find merged variant '1.0'
-    v10 = next(obj for obj in objs if obj.variant == '1.0')
-    assert set(v10.attributes) == {'router', 'special'}
+    assert set(by_variant['1.0'].attributes) == {'router', 'special'}
     # Find merged variant '1.1'
-    v11 = next(obj for obj in objs if obj.variant == '1.1')
-    assert set(v11.attributes) == {'router', 'special'}
+    assert set(by_variant['1.1'].attributes) == {'router', 'special'}
     # Find merged variant '2.0'
-    v20 = next(obj for obj in objs if obj.variant == '2.0')
-    assert set(v20.attributes) == {'router', 'switch'}
+    assert set(by_variant['2.0'].attributes) == {'router', 'switch'}
     # Find merged variant 'foo'
-    vfoo = next(obj for obj in objs if obj.variant == 'foo')
-    assert set(vfoo.attributes) == {'router'}
+    assert set(by_variant['foo'].attributes) == {'router'}
 
 
-def test_variants_with_attributes_any_logic():
-    # Simulate merged variant objects
-    objs = [
-        VariantPluginBase('1.0', ['router', 'special']),
-        VariantPluginBase('1.1', ['router', 'special']),
-        VariantPluginBase('2.0', ['router', 'switch']),
-        VariantPluginBase('foo', ['router']),
-    ]
+def test_variants_with_attributes_any_logic(sample_objs):
     # Should return all variants with 'router' or 'switch'
-    filtered = [obj for obj in objs if
-                any(attr in obj.attributes for attr in ['router', 'switch'])]
-    assert set(obj.variant for obj in filtered) == {'1.0', '1.1', '2.0', 'foo'}
+    filtered = VariantPluginBase.get_variants(sample_objs, ['router', 'switch'])
+    assert {obj.variant for obj in filtered} == {'1.0', '1.1', '2.0', 'foo'}
     # Should return only those with 'special'
-    filtered2 = [obj for obj in objs if
-                 any(attr in obj.attributes for attr in ['special'])]
-    assert set(obj.variant for obj in filtered2) == {'1.0', '1.1'}
+    filtered2 = VariantPluginBase.get_variants(sample_objs, ['special'])
+    assert {obj.variant for obj in filtered2} == {'1.0', '1.1'}
     # Should return only those with 'switch'
-    filtered3 = [obj for obj in objs if
-                 any(attr in obj.attributes for attr in ['switch'])]
-    assert set(obj.variant for obj in filtered3) == {'2.0'}
+    filtered3 = VariantPluginBase.get_variants(sample_objs, 'switch')
+    assert {obj.variant for obj in filtered3} == {'2.0'}
 
 
 def test_variant_setup_parsing():
@@ -174,107 +198,23 @@ def test_variant_setup_parsing():
     assert all(isinstance(obj, VariantPluginBase) for obj in objs)
     # Check that the parsed objects have expected attributes and variants
     found = {(tuple(obj.attrs), obj.variant) for obj in objs}
-    expected = {
-        (('win',), 'C:App'),
-        (('linux',), '/opt/app'),
-        (('special',), 'setup1'),
-    }
-    assert found == expected
-
-
-def test_variants_with_attributes_none_or_empty_fixture():
-    # This test uses the fixture-like logic directly, but in a real pytest session you would use the fixture
-    class DummyConfig:
-        pass
-
-    # Simulate variants: some with attributes, one with none
-    objs = [
-        VariantPluginBase('1.0', ['router', 'special']),
-        VariantPluginBase('1.1', ['router', 'special']),
-        VariantPluginBase('2.0', ['router', 'switch']),
-        VariantPluginBase('foo', ['router']),
-        VariantPluginBase('bare', []),
-    ]
-
-    def variants_with_attributes(attributes=None):
-        if not attributes:
-            return [obj for obj in objs if not obj.attributes]
-        else:
-            return [obj for obj in objs if
-                    any(attr in obj.attributes for attr in attributes)]
-
-    # Test with None
-    filtered_none = variants_with_attributes(None)
-    assert set(obj.variant for obj in filtered_none) == {'bare'}
-    # Test with empty list
-    filtered_empty = variants_with_attributes([])
-    assert set(obj.variant for obj in filtered_empty) == {'bare'}
-    # Test with attribute
-    filtered_router = variants_with_attributes(['router'])
-    assert set(obj.variant for obj in filtered_router) == {'1.0', '1.1', '2.0',
-                                                           'foo'}
-
-
-def test_get_variants_with_attributes_no_attributes():
-    objs = [
-        VariantPluginBase('1.0', ['router', 'special']),
-        VariantPluginBase('1.1', ['router', 'special']),
-        VariantPluginBase('2.0', ['router', 'switch']),
-        VariantPluginBase('foo', ['router']),
-        VariantPluginBase('bare', []),
-    ]
-    filtered = VariantPluginBase.get_variants(objs)
-    assert len(filtered) == 1
-    assert filtered[0].variant == 'bare'
-
-
-def test_get_variants_with_attributes_single():
-    objs = [
-        VariantPluginBase('1.0', ['router', 'special']),
-        VariantPluginBase('1.1', ['router', 'special']),
-        VariantPluginBase('2.0', ['router', 'switch']),
-        VariantPluginBase('foo', ['router']),
-        VariantPluginBase('bare', []),
-    ]
-    filtered = VariantPluginBase.get_variants(objs, attributes=['switch'])
-    assert set(obj.variant for obj in filtered) == {'2.0'}
+    assert found == _EXPECTED_VARIANT_SETUP
 
 
-def test_get_variants_with_attributes_multiple():
-    objs = [
-        VariantPluginBase('1.0', ['router', 'special']),
-        VariantPluginBase('1.1', ['router', 'special']),
-        VariantPluginBase('2.0', ['router', 'switch']),
-        VariantPluginBase('foo', ['router']),
-        VariantPluginBase('bare', []),
-    ]
-    filtered = VariantPluginBase.get_variants(objs, attributes=['router', 'switch'])
-    assert set(obj.variant for obj in filtered) == {'1.0', '1.1', '2.0', 'foo'}
-
-
-def test_get_variants_with_attributes_nonexistent():
-    objs = [
-        VariantPluginBase('1.0', ['router', 'special']),
-        VariantPluginBase('1.1', ['router', 'special']),
-        VariantPluginBase('2.0', ['router', 'switch']),
-        VariantPluginBase('foo', ['router']),
-        VariantPluginBase('bare', []),
-    ]
-    filtered = VariantPluginBase.get_variants(objs, attributes=['notfound'])
-    assert filtered == []
-
-
-def test_get_variants_with_attributes_empty_list():
-    objs = [
-        VariantPluginBase('1.0', ['router', 'special']),
-        VariantPluginBase('1.1', ['router', 'special']),
-        VariantPluginBase('2.0', ['router', 'switch']),
-        VariantPluginBase('foo', ['router']),
-        VariantPluginBase('bare', []),
-    ]
-    filtered = VariantPluginBase.get_variants(objs, [])
-    assert len(filtered) == 1
-    assert filtered[0].variant == 'bare'
+@pytest.mark.parametrize('attributes, expected', [
+    (None, ['bare']),
+    ([], ['bare']),
+    (['switch'], ['2.0']),
+    (['router'], ['1.0', '1.1', '2.0', 'foo']),
+    (['router', 'switch'], ['1.0', '1.1', '2.0', 'foo']),
+    (['notfound'], []),
+])
+def test_get_variants_with_attributes(sample_objs, attributes, expected):
+    if attributes is None:
+        filtered = VariantPluginBase.get_variants(sample_objs)
+    else:
+        filtered = VariantPluginBase.get_variants(sample_objs, attributes=attributes)
+    assert [obj.variant for obj in filtered] == expected
 
 
 def test_parse_variant_args_no_attributes():
@@ -290,22 +230,131 @@ def test_parse_variant_args_merge_attributes():
         'special:1.1',
     ])
     by_variant = {o.variant: set(o.attributes) for o in objs}
-    assert by_variant == {
-        '1.0': {'router', 'special'},
-        '1.1': {'router', 'special'},
-        '2.0': {'switch'},
-    }
+    assert by_variant == _EXPECTED_MERGE_ATTRIBUTES
 
 
 def test_parse_variant_args_escape_and_inheritance():
     s = r'router:special:1.0,1.1,1\,2,1\:0,1:0'
     objs = VariantPluginBase.parse_variants([s])
     found = {(tuple(sorted(obj.attributes)), obj.variant) for obj in objs}
-    expected = {
-        (('router', 'special'), '1.0'),
-        (('router', 'special'), '1.1'),
-        (('router', 'special'), '1,2'),
-        (('router', 'special'), '1:0'),
-        (('1',), '0'),
+    assert found == _EXPECTED_ESCAPE_INHERITANCE
+
+
+def test_get_all_variant_objs_cached_on_config():
+    class DummyConfig:
+        def __init__(self):
+            self.calls = 0
+
+        def getoption(self, name):
+            self.calls += 1
+            return ['router:1.0,switch:2.0']
+
+    config = DummyConfig()
+    objs = get_all_variant_objs(config)
+    assert [obj.variant for obj in objs] == ['1.0', '2.0']
+    again = get_all_variant_objs(config)
+    assert [(obj.attributes, obj.variant) for obj in again] == [(['router'], '1.0'), (['switch'], '2.0')]
+    assert again[0] is not objs[0]
+    assert config.calls == 1
+
+
+def test_variantpluginbase_get_attributes_empty_and_single():
+    assert VariantPluginBase.get_attributes([]) == []
+    obj = VariantPluginBase('1.0', ['switch', 'router', 'router'])
+    attributes = VariantPluginBase.get_attributes([obj])
+    assert attributes == ['router', 'switch']
+    assert attributes is not obj.attributes
+    obj.attributes.reverse()
+    assert VariantPluginBase.get_attributes([obj]) == ['router', 'switch']
+    assert VariantPluginBase.get_attributes(o for o in [obj]) == ['router', 'switch']
+
+
+def test_variant_filter():
+    objs = VariantPluginBase.parse_variants(['switch:2.0,router:1.1,1.0,bare'])
+    variant_filter = VariantFilter(objs)
+    assert variant_filter.all_variants() == objs
+    assert variant_filter.all_variants() is not objs
+    assert variant_filter.all_variant_attributes() == ['router', 'switch']
+    assert [obj.variant for obj in variant_filter.by_attribute('router')] == ['1.0', '1.1', 'bare']
+    assert [obj.variant for obj in variant_filter.by_attributes(['router', 'switch'])] == ['1.0', '1.1', '2.0', 'bare']
+    assert variant_filter.by_attribute(None) == []
+
+
+def test_variant_filter_reflects_attribute_changes():
+    objs = VariantPluginBase.parse_variants(['a:v1,b:v2'])
+    variant_filter = VariantFilter(objs)
+    assert [obj.variant for obj in variant_filter.by_attribute('a')] == ['v1']
+    objs[1].attributes.append('a')
+    assert [obj.variant for obj in variant_filter.by_attribute('a')] == ['v1', 'v2']
+    assert [obj.variant for obj in variant_filter.by_attributes(['a'])] == ['v1', 'v2']
+
+
+def test_pytest_unconfigure_clears_cache():
+    class DummyConfig:
+        def getoption(self, name):
+            return ['router:1.0']
+
+    config = DummyConfig()
+    get_all_variant_objs(config)
+    config._kaleido_variant_ids = ['router:1.0']
+    pytest_unconfigure(config)
+    assert not hasattr(config, '_kaleido_variant_lists')
+    assert not hasattr(config, '_kaleido_variant_ids')
+
+
+def test_variantpluginbase_init_attributes():
+    assert VariantPluginBase('1.0').attributes == []
+    assert VariantPluginBase('1.0', []).attributes == []
+    attributes = ['router']
+    obj = VariantPluginBase('1.0', attributes)
+    assert obj.attributes == ['router']
+    assert obj.attributes is not attributes
+    assert VariantPluginBase('1.0', ['switch', 'router', 'switch']).attributes == ['router', 'switch']
+    assert VariantPluginBase('1.0', ('router',)).attributes == ['router']
+    assert VariantPluginBase('1.0', ('switch', 'router')).attributes == ['router', 'switch']
+    assert VariantPluginBase('1.0', iter(['router'])).attributes == ['router']
+    generated = (attr for attr in ('switch', 'router', 'switch'))
+    assert VariantPluginBase('1.0', generated).attributes == ['router', 'switch']
+
+
+def test_get_variants_empty_input():
+    assert VariantPluginBase.get_variants([], ['router']) == []
+
+
+def test_parse_variants_subclass_with_own_init():
+    class Product(VariantPluginBase):
+        __slots__ = ('label',)
+
+        def __init__(self, variant, attributes=None):
+            super().__init__(variant, attributes)
+            self.label = variant.upper()
+
+    objs = Product.parse_variants(['b:a:v1,v2', 'c:v1'])
+    assert all(type(obj) is Product for obj in objs)
+    assert {obj.variant: (obj.attributes, obj.label) for obj in objs} == {
+        'v1': (['a', 'b', 'c'], 'V1'),
+        'v2': (['a', 'b'], 'V2'),
     }
-    assert found == expected
+
+
+def test_variantpluginbase_init_variant_str_subclass():
+    class Name(str):
+        pass
+
+    obj = VariantPluginBase(Name('1.0'), ['router'])
+    assert obj.variant == '1.0'
+    assert type(obj.variant) is Name
+
+
+def test_variantpluginbase_init_non_str_attributes():
+    obj = VariantPluginBase('v', [2, 1])
+    assert obj.attributes == [1, 2]
+
+
+def test_get_variants_reflects_attribute_changes():
+    obj = VariantPluginBase('3.0', ['router'])
+    obj.attributes.append('switch')
+    assert VariantPluginBase.get_variants([obj], 'switch') == [obj]
+    obj.attributes.clear()
+    assert VariantPluginBase.get_variants([obj], ['router']) == []
+    assert VariantPluginBase.get_variants([obj], None) == [obj]